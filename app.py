@@ -1,22 +1,41 @@
+import asyncio
+import base64
+import calendar
 import threading
 import time
-import json
 import os
+import gzip
 import hashlib
+import hmac
+import html
+import logging
+import re
+import secrets
 import smtplib
+import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from collections import OrderedDict
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
 from email.message import EmailMessage
+from email.utils import parsedate_to_datetime
+from functools import lru_cache, partial
+from io import BytesIO
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from heapq import merge, nlargest
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Tuple
 
 import feedparser
+import orjson
 import requests
-from fastapi import FastAPI, Query, Form, Request
-from fastapi.middleware.gzip import GZipMiddleware
+from requests.adapters import HTTPAdapter
+from dateutil import parser as dateparser
+from fastapi import BackgroundTasks, FastAPI, Query, Form, Request
 from fastapi.responses import (
     HTMLResponse,
-    JSONResponse,
     Response,
-    RedirectResponse,
 )
 
 # ------------------------------- Config --------------------------------
@@ -75,9 +94,35 @@ API_QUERIES: Dict[str, Dict[str, str]] = {
 }
 
 CACHE_TTL_SECONDS = 10 * 60
+# Largest page /api/news will serve from the merged all-categories list
+HOME_MAX_ITEMS = 200
+# Page size the frontend asks for; its body is encoded as soon as data lands
+NEWS_DEFAULT_LIMIT = 60
 BACKGROUND_REFRESH_SECONDS = 10 * 60
+# Set to 0 on all but one worker so a multi-worker deployment refreshes once
+BACKGROUND_REFRESH = os.getenv("BACKGROUND_REFRESH", "1") != "0"
+
+# How long one category waits for all of its sources before merging what has
+# arrived (stragglers are skipped); also caps how long a caller waits on
+# another thread's in-flight refresh of that category
+CATEGORY_FETCH_TIMEOUT_SECONDS = 15
+# Socket connect/read timeout for feed downloads. The read timeout applies
+# to each socket read, not to the whole body; see FEED_DOWNLOAD_SECONDS.
+FEED_HTTP_TIMEOUT = (5, 8)
+# Wall-clock budget for reading one response body, so a server trickling
+# bytes cannot hold a fetch worker indefinitely
+FEED_DOWNLOAD_SECONDS = 8
+FEED_USER_AGENT = "CyberIntel/1.0 (+https://github.com/DhanrajGangnaik/CTI_Platform)"
 
 USERS_FILE = "users.json"
+# scrypt CPU/memory cost for password hashes (a power of two). Each record
+# stores the cost it was hashed with, so raising this only affects new hashes.
+PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", "") or 16384)
+if not (PASSWORD_SCRYPT_N > 1 and PASSWORD_SCRYPT_N & (PASSWORD_SCRYPT_N - 1) == 0):
+    raise ValueError(f"PASSWORD_SCRYPT_N must be a power of two > 1, got {PASSWORD_SCRYPT_N}")
+# Cost of scrypt records written before the cost was stored with each hash.
+# Fixed for good: it must not follow PASSWORD_SCRYPT_N.
+LEGACY_SCRYPT_N = 16384
 
 # SMTP (optional – required for real email sending)
 SMTP_HOST = os.getenv("SMTP_HOST", "")
@@ -86,17 +131,81 @@ SMTP_USER = os.getenv("SMTP_USER", "")
 SMTP_PASS = os.getenv("SMTP_PASS", "")
 SMTP_FROM = os.getenv("SMTP_FROM", SMTP_USER or "")
 
-SESSION_COOKIE_NAME = "ci_email"
+SESSION_COOKIE_NAME = "ci_session"
+SESSION_MAX_AGE = 60 * 60 * 24 * 30  # 30 days
+# Key for signing session cookies; a required deploy secret. The random
+# fallback signs everyone out on every restart and differs between workers.
+SESSION_SECRET = os.getenv("SESSION_SECRET", "").encode("utf-8")
+if not SESSION_SECRET:
+    logging.getLogger(__name__).warning(
+        "SESSION_SECRET is not set; using a random key, so sessions end on restart"
+    )
+    SESSION_SECRET = secrets.token_bytes(32)
+# Mark the cookie Secure when served over HTTPS only (e.g. behind Fly's proxy)
+SESSION_COOKIE_SECURE = os.getenv("SESSION_COOKIE_SECURE", "0") == "1"
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_SIZE = 512
+GZIP_LEVEL = 6
+# Static pages are compressed once at import, so spend the extra CPU there
+STATIC_GZIP_LEVEL = 9
 
 # ------------------------------ App/Core -------------------------------
 
-app = FastAPI(title="CyberIntel – Tiles View")
-app.add_middleware(GZipMiddleware, minimum_size=512)
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    """Run the background refresher for as long as the server is up."""
+    task = asyncio.create_task(_refresh_loop()) if BACKGROUND_REFRESH else None
+    yield
+    if task:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+app = FastAPI(
+    title="CyberIntel – Tiles View",
+    lifespan=_lifespan,
+)
 
+# Each category's bucket and in-flight marker has its own lock, so reads and
+# refreshes of unrelated categories never wait on each other. _cache_lock
+# covers the cross-category state (merged list, total count) and _seen_lock the
+# notification LRU, so a refresh marking items seen never blocks /api/news.
+_cat_locks: Dict[str, threading.Lock] = {c: threading.Lock() for c in CATEGORIES}
 _cache_lock = threading.Lock()
 _news_cache: Dict[str, Dict] = {}
+_home_cache: List["Item"] = []  # all categories merged, newest first
+# Encoded /api/news bodies per limit: (json, gzip, etag). Emptied whenever
+# _home_cache changes; the default page is re-encoded straight away.
+_home_pages: Dict[int, Tuple[bytes, bytes, str]] = {}
 _last_build_time_iso = datetime.now(timezone.utc).isoformat()
-_seen_ids = set()  # title+link we’ve already notified about
+# 8-byte digests of title+link we’ve already notified about, oldest first.
+# Bounded LRU: items still in a feed are refreshed on every pass, so only
+# stories that dropped out of every feed are ever evicted.
+_seen_ids: "OrderedDict[bytes, None]" = OrderedDict()
+_SEEN_MAX = 10_000
+_seen_lock = threading.Lock()
+_inflight: Dict[str, threading.Event] = {}  # categories being refreshed now
+# Distinct stories across every cached category, recounted on each rebuild
+_total_all = 0
+# Per feed URL: (ETag, Last-Modified, body digest, normalized items) from
+# the last 200
+_feed_meta: Dict[str, Tuple[str, str, bytes, List["Item"]]] = {}
+# Feodo cards for ((cache period, max_items), items), shared by the categories
+# that show them
+_feodo_lock = threading.Lock()
+_feodo_cache: Tuple[Tuple[int, int], List["Item"]] = ((-1, 0), [])
+
+# Parsed users.json, keyed by the file mtime it was read at (-1: never read)
+_users_lock = threading.RLock()
+_users_cache: Dict = {"mtime": -1, "list": [], "by_email": {}}
+
+# One keep-alive session for every outbound fetch, so repeated refreshes reuse
+# TCP/TLS connections instead of handshaking per request. Its adapter is
+# mounted once the fetch plan has sized _POOL, further down.
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = FEED_USER_AGENT
 
 
 def _now() -> float:
@@ -107,80 +216,260 @@ def _iso_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _normalize_entry(entry) -> Dict:
-    title = (entry.get("title") or "").strip()
-    link = entry.get("link") or ""
-    summary = (entry.get("summary") or entry.get("description") or "").strip()
-    source = (entry.get("source", {}) or {}).get("title") or entry.get("author") or ""
-    published_parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+def _download(
+    url: str, timeout=FEED_HTTP_TIMEOUT, **kwargs
+) -> Tuple[requests.Response, bytes]:
+    """
+    GET url on the shared session and read the body within
+    FEED_DOWNLOAD_SECONDS. The deadline is checked between chunks, each of
+    which is itself bounded by the socket read timeout. Raises
+    requests.Timeout when the body takes too long.
+    """
+    deadline = time.monotonic() + FEED_DOWNLOAD_SECONDS
+    chunks: List[bytes] = []
+    with _SESSION.get(url, stream=True, timeout=timeout, **kwargs) as resp:
+        # read1 (urllib3 >= 2.2) returns whatever one socket read brings;
+        # iter_content would keep reading until a whole chunk arrived
+        while chunk := resp.raw.read1(64 * 1024, decode_content=True):
+            chunks.append(chunk)
+            if time.monotonic() > deadline:
+                raise requests.Timeout(f"{url} body not read within {FEED_DOWNLOAD_SECONDS}s")
+    return resp, b"".join(chunks)
+
+
+def _etag(body: bytes) -> str:
+    # Weak, because the same tag is served for the gzip and identity bodies
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _encoded_response(
+    request: Request,
+    body: bytes,
+    media_type: str,
+    gz: Optional[bytes] = None,
+    etag: Optional[str] = None,
+) -> Response:
+    """
+    Serve body gzip-encoded when the client accepts it. Pass gz to reuse a
+    copy compressed ahead of time instead of compressing per request, and
+    etag to skip hashing the body. Answers 304 when If-None-Match matches.
+    """
+    etag = etag or _etag(body)
+    headers = {"Vary": "Accept-Encoding", "ETag": etag}
+    client_tags = request.headers.get("if-none-match", "")
+    if etag in (t.strip() for t in client_tags.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    accepts_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    if accepts_gzip and len(body) >= GZIP_MIN_SIZE:
+        headers["Content-Encoding"] = "gzip"
+        if gz is None:
+            gz = gzip.compress(body, GZIP_LEVEL)
+        return Response(content=gz, media_type=media_type, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def _iso_to_ts(value: str) -> int:
+    """Epoch seconds for an ISO-8601 string; naive values are taken as UTC."""
+    try:
+        dt = dateparser.isoparse(value)
+    except (TypeError, ValueError):
+        return int(_now())
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+@dataclass(slots=True)
+class Item:
+    """One story card. orjson serialises it as a plain JSON object."""
+
+    title: str
+    link: str
+    summary: str
+    source: str
+    published: str
+    published_ts: int
+
+
+_BY_TS = attrgetter("published_ts")  # sort key: newest first with reverse
+
+# UTC timestamp template, printf-style so a struct_time slice formats directly
+_ISO_FMT = "%04d-%02d-%02dT%02d:%02d:%02d+00:00"
+_TAG_RE = re.compile(r"<[^>]*>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _plain_text(value: str) -> str:
+    """Feed markup reduced to plain text; the frontend escapes it for display."""
+    return _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", value))).strip()
+
+
+def _plain_title(value: str) -> str:
+    """
+    Headline with entities decoded and whitespace collapsed. Tags are kept:
+    titles are text, and security headlines often name <script> or <iframe>.
+    """
+    return _SPACE_RE.sub(" ", html.unescape(value)).strip()
+
+
+def _date_to_ts(value: str) -> int:
+    """Epoch seconds for an RSS (RFC 822) or Atom (ISO-8601) date."""
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return _iso_to_ts(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+_EMPTY: Dict = {}
+
+
+def _normalize_entry(entry) -> Item:
+    get = entry.get  # bound once; this runs for every entry of every feed
+    title = _plain_title(get("title") or "")
+    link = get("link") or ""
+    summary = _plain_text(get("summary") or get("description") or "")
+    source = (get("source") or _EMPTY).get("title") or get("author") or ""
+    # A feed repeats the same source on every entry; keep one shared copy
+    source = sys.intern(source)
+    published_parsed = get("published_parsed") or get("updated_parsed")
     if published_parsed:
-        published = datetime(*published_parsed[:6], tzinfo=timezone.utc).isoformat()
+        published = _ISO_FMT % published_parsed[:6]
+        published_ts = calendar.timegm(published_parsed)
     else:
         published = _iso_now()
-    return {
-        "title": title,
-        "link": link,
-        "summary": summary,
-        "source": source,
-        "published": published,
-    }
+        published_ts = int(_now())
+    return Item(title, link, summary, source, published, published_ts)
 
 
 # -------------------- User storage + email helpers ---------------------
 
 def _load_users() -> List[Dict]:
-    if not os.path.exists(USERS_FILE):
-        return []
+    """
+    Users from USERS_FILE, parsed again only when the file's mtime changes.
+    The list is shared with the cache; change it via _save_users.
+    """
     try:
-        with open(USERS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return []
+        mtime = os.stat(USERS_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+    with _users_lock:
+        if mtime != _users_cache["mtime"]:
+            users: List[Dict] = []
+            if mtime is not None:
+                try:
+                    with open(USERS_FILE, "rb") as f:
+                        users = orjson.loads(f.read())
+                except Exception:
+                    users = []
+            _cache_users(users, mtime)
+        return _users_cache["list"]
+
+
+def _cache_users(users: List[Dict], mtime: Optional[int]) -> None:
+    _users_cache["mtime"] = mtime
+    _users_cache["list"] = users
+    _users_cache["by_email"] = {u.get("email"): u for u in users}
 
 
 def _save_users(users: List[Dict]) -> None:
-    with open(USERS_FILE, "w", encoding="utf-8") as f:
-        json.dump(users, f, indent=2)
+    """
+    Write to a temp file and rename it over USERS_FILE, so a crash
+    mid-write never leaves a truncated file behind.
+    """
+    tmp = USERS_FILE + ".tmp"
+    with _users_lock:
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(users, option=orjson.OPT_INDENT_2))
+        os.replace(tmp, USERS_FILE)
+        _cache_users(users, os.stat(USERS_FILE).st_mtime_ns)
 
 
-def _get_user_by_email(email: str) -> Optional[Dict]:
-    for u in _load_users():
-        if u.get("email") == email:
-            return u
-    return None
+def _hash_password(password: str, salt: bytes, n: int = PASSWORD_SCRYPT_N) -> str:
+    """
+    scrypt digest of a password, hex-encoded for users.json. Deliberately
+    slow; async callers must run it in a worker thread.
+    """
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=n,
+        r=8,
+        p=1,
+        dklen=32,
+        # scrypt needs 128 * r * n bytes; OpenSSL's default cap is 32 MiB
+        maxmem=2 * 128 * 8 * n,
+    ).hex()
+
+
+def _verify_password(user: Dict, password: str) -> bool:
+    """
+    Check a password against a stored record, using the record's own salt
+    and cost. Records from before salting hold a bare SHA-256 hex digest.
+    """
+    stored = user.get("password_hash") or ""
+    if "salt" in user:
+        candidate = _hash_password(
+            password,
+            bytes.fromhex(user["salt"]),
+            int(user.get("scrypt_n") or LEGACY_SCRYPT_N),
+        )
+    else:
+        candidate = hashlib.sha256(password.encode("utf-8")).hexdigest()
+    return hmac.compare_digest(candidate, stored)
 
 
-def _register_or_update_user(username: str, email: str, password: str) -> (Dict, bool):
+def _register_or_update_user(
+    username: str, email: str, password: str
+) -> Tuple[Optional[Dict], bool]:
     """
-    Create or update a user.
-    Returns (user_dict, is_new_user).
+    Create a user, or update an existing user's name once the password
+    matches the one on file. Returns (user_dict, is_new_user); user_dict is
+    None when the email is registered with a different password.
     """
-    users = _load_users()
-    pwd_hash = hashlib.sha256(password.encode("utf-8")).hexdigest()
     email = email.strip()
     username = username.strip()
 
-    existing = None
-    for u in users:
-        if u.get("email") == email:
-            existing = u
-            break
-
-    if existing:
-        existing["username"] = username
-        existing["password_hash"] = pwd_hash
-        is_new = False
-    else:
-        existing = {
-            "username": username,
-            "email": email,
-            "password_hash": pwd_hash,
-            "created": _iso_now(),
+    with _users_lock:
+        _load_users()
+        existing = _users_cache["by_email"].get(email)
+
+    # scrypt runs outside the lock so concurrent sign-ins don't queue on it
+    if existing is not None and not _verify_password(existing, password):
+        return None, False
+    credentials: Dict = {}
+    if existing is None or existing.get("scrypt_n") != PASSWORD_SCRYPT_N:
+        # new account, a legacy SHA-256 record, or a changed cost: (re)hash
+        salt = os.urandom(16)
+        credentials = {
+            "password_hash": _hash_password(password, salt),
+            "salt": salt.hex(),
+            "scrypt_n": PASSWORD_SCRYPT_N,
         }
-        users.append(existing)
-        is_new = True
 
-    _save_users(users)
+    is_new = existing is None
+    with _users_lock:
+        users = _load_users()
+        changed = _users_cache["by_email"].get(email) is not existing
+        if not changed:
+            if is_new:
+                existing = {
+                    "username": username,
+                    "email": email,
+                    **credentials,
+                    "created": _iso_now(),
+                }
+                users.append(existing)
+            else:
+                existing["username"] = username
+                existing.update(credentials)
+            _save_users(users)
+    if changed:
+        # registered or edited by another request while we were hashing
+        return _register_or_update_user(username, email, password)
     return existing, is_new
 
 
@@ -219,7 +508,7 @@ def _send_welcome_email(user: Dict) -> None:
     _send_email(user["email"], subject, body)
 
 
-def _notify_new_items(new_items: List[Dict]) -> None:
+def _notify_new_items(new_items: List[Item]) -> None:
     """Send a simple notification email when new content appears."""
     if not new_items:
         return
@@ -229,7 +518,7 @@ def _notify_new_items(new_items: List[Dict]) -> None:
 
     lines = []
     for it in new_items[:5]:
-        lines.append(f"- {it.get('title','(untitled)')} :: {it.get('link','#')}")
+        lines.append(f"- {it.title or '(untitled)'} :: {it.link or '#'}")
     body = "New security stories were just added to CyberIntel:\n\n" + "\n".join(lines)
 
     for u in users:
@@ -238,54 +527,111 @@ def _notify_new_items(new_items: List[Dict]) -> None:
             _send_email(email, "CyberIntel – New security stories", body)
 
 
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str) -> bytes:
+    return hmac.new(SESSION_SECRET, payload.encode("ascii"), hashlib.sha256).digest()
+
+
+def _session_token(user: Dict) -> str:
+    """
+    Signed session cookie value: base64url JSON claims, a dot, then the
+    HMAC-SHA256 of the claims. Carries everything the pages show about the
+    user, so reading it needs no users.json lookup.
+    """
+    claims = {
+        "email": user["email"],
+        "username": user.get("username") or "",
+        "exp": int(_now()) + SESSION_MAX_AGE,
+    }
+    payload = _b64encode(orjson.dumps(claims))
+    return payload + "." + _b64encode(_sign(payload))
+
+
 def _current_user(request: Request) -> Optional[Dict]:
-    email = request.cookies.get(SESSION_COOKIE_NAME)
-    if not email:
+    """Claims from a valid, unexpired session cookie; None otherwise."""
+    token = request.cookies.get(SESSION_COOKIE_NAME)
+    if not token:
+        return None
+    payload, _, sig = token.partition(".")
+    try:
+        if not hmac.compare_digest(_b64decode(sig), _sign(payload)):
+            return None
+        claims = orjson.loads(_b64decode(payload))
+    except ValueError:
+        return None
+    if claims.get("exp", 0) < _now():
         return None
-    return _get_user_by_email(email)
+    return claims
 
 
 # ----------------------- External intel helpers ------------------------
 
-def _fetch_feodo_iocs(max_items: int = 25) -> List[Dict]:
+_FEODO_TEMPLATES = [
+    "Feodo Tracker lists {ip} as an active command-and-control endpoint used by banking malware.",
+    "Suspicious host {ip} is currently flagged in the Feodo Tracker blocklist for C2 activity.",
+    "Abuse.ch FeodoTracker reports {ip} as part of a botnet infrastructure serving malicious traffic.",
+    "Indicator {ip} is tagged by Feodo Tracker as a high-risk C2 node associated with credential theft.",
+]
+# Split around the placeholder once so each card is a plain concatenation
+_FEODO_PREFIX = [t.split("{ip}")[0] for t in _FEODO_TEMPLATES]
+_FEODO_SUFFIX = [t.split("{ip}")[1] for t in _FEODO_TEMPLATES]
+
+
+def _fetch_feodo_iocs(max_items: int = 25) -> List[Item]:
+    """
+    Feodo Tracker IPs as IOC cards, downloaded at most once per cache
+    period. Three categories ask for the same list in the same refresh; the
+    lock makes the concurrent callers share one download.
+    """
+    global _feodo_cache
+    tick = int(_now() // CACHE_TTL_SECONDS)
+    with _feodo_lock:
+        if _feodo_cache[0] != (tick, max_items):
+            items = _download_feodo_iocs(max_items)
+            if not items:
+                return []
+            _feodo_cache = ((tick, max_items), items)
+        return _feodo_cache[1]
+
+
+def _download_feodo_iocs(max_items: int) -> List[Item]:
     """Feodo Tracker IPs as IOC cards with varied summaries."""
     if not IOC_SOURCE:
         return []
 
     try:
-        resp = requests.get(IOC_SOURCE, timeout=10)
+        resp, body = _download(IOC_SOURCE, timeout=10)
         resp.raise_for_status()
         lines = [
             ln.strip()
-            for ln in resp.text.splitlines()
+            for ln in body.decode("utf-8", "replace").splitlines()
             if ln and not ln.startswith("#")
         ]
     except Exception:
         return []
 
-    templates = [
-        "Feodo Tracker lists {ip} as an active command-and-control endpoint used by banking malware.",
-        "Suspicious host {ip} is currently flagged in the Feodo Tracker blocklist for C2 activity.",
-        "Abuse.ch FeodoTracker reports {ip} as part of a botnet infrastructure serving malicious traffic.",
-        "Indicator {ip} is tagged by Feodo Tracker as a high-risk C2 node associated with credential theft.",
-    ]
-
-    items: List[Dict] = []
-    for idx, ip in enumerate(lines[:max_items]):
-        summary = templates[idx % len(templates)].format(ip=ip)
-        items.append(
-            {
-                "title": f"Feodo C2 IP {ip}",
-                "link": "https://feodotracker.abuse.ch/browse/",
-                "summary": summary,
-                "source": "Abuse.ch Feodo Tracker",
-                "published": _iso_now(),
-            }
+    now, now_ts = _iso_now(), int(_now())
+    return [
+        Item(
+            title="Feodo C2 IP " + ip,
+            link="https://feodotracker.abuse.ch/browse/",
+            summary=_FEODO_PREFIX[idx & 3] + ip + _FEODO_SUFFIX[idx & 3],
+            source="Abuse.ch Feodo Tracker",
+            published=now,
+            published_ts=now_ts,
         )
-    return items
+        for idx, ip in enumerate(lines[:max_items])
+    ]
 
 
-def _fetch_otx_for_category(cat: str, max_items: int = 25) -> List[Dict]:
+def _fetch_otx_for_category(cat: str, max_items: int = 25) -> List[Item]:
     """AlienVault OTX pulses per category."""
     if not OTX_API_KEY:
         return []
@@ -299,13 +645,13 @@ def _fetch_otx_for_category(cat: str, max_items: int = 25) -> List[Dict]:
         url = "https://otx.alienvault.com/api/v1/search/pulses"
         headers = {"X-OTX-API-KEY": OTX_API_KEY}
         params = {"q": query, "page": 1}
-        r = requests.get(url, headers=headers, params=params, timeout=10)
+        r, body = _download(url, timeout=10, headers=headers, params=params)
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(body)
     except Exception:
         return []
 
-    items: List[Dict] = []
+    items: List[Item] = []
     for p in data.get("results", [])[:max_items]:
         pulse_id = p.get("id") or ""
         link = (
@@ -314,194 +660,361 @@ def _fetch_otx_for_category(cat: str, max_items: int = 25) -> List[Dict]:
             else "https://otx.alienvault.com/"
         )
 
+        # OTX timestamps are naive ISO strings; parse once at ingest and render
+        # them in the same UTC format as every other source.
+        published_ts = _iso_to_ts(p.get("modified") or p.get("created") or "")
         items.append(
-            {
-                "title": (p.get("name") or "OTX pulse").strip(),
-                "link": link,
-                "summary": (p.get("description") or "").strip(),
-                "source": "AlienVault OTX",
-                "published": p.get("modified")
-                or p.get("created")
-                or _iso_now(),
-            }
+            Item(
+                title=(p.get("name") or "OTX pulse").strip(),
+                link=link,
+                summary=(p.get("description") or "").strip(),
+                source="AlienVault OTX",
+                published=_ISO_FMT % time.gmtime(published_ts)[:6],
+                published_ts=published_ts,
+            )
         )
     return items
 
 
 # -------------------------- Fallback content ---------------------------
 
-def _fallback_items(cat: str) -> List[Dict]:
-    now = _iso_now()
-    base = {
-        "Ransomware": [
-            {
-                "title": "CISA Ransomware Guidance & Resources",
-                "link": "https://www.cisa.gov/stopransomware",
-                "summary": "Official CISA hub with advisories, checklists, and prevention guidance for ransomware.",
-                "source": "CISA",
-                "published": now,
-            },
-            {
-                "title": "Nomoreransom.org Decryption Tools",
-                "link": "https://www.nomoreransom.org/en/decryption-tools.html",
-                "summary": "Repository of free decryption tools and advice for victims of common ransomware families.",
-                "source": "No More Ransom",
-                "published": now,
-            },
-        ],
-        "Vulnerabilities": [
-            {
-                "title": "NVD – National Vulnerability Database",
-                "link": "https://nvd.nist.gov/vuln/search",
-                "summary": "Search and browse CVEs with CVSS scoring, references, and impact information.",
-                "source": "NIST",
-                "published": now,
-            },
-            {
-                "title": "CISA Known Exploited Vulnerabilities Catalog",
-                "link": "https://www.cisa.gov/known-exploited-vulnerabilities-catalog",
-                "summary": "Authoritative list of CVEs that are known to be actively exploited in the wild.",
-                "source": "CISA",
-                "published": now,
-            },
-        ],
-        "Data Breaches": [
-            {
-                "title": "Have I Been Pwned – Latest Breaches",
-                "link": "https://haveibeenpwned.com/PwnedWebsites",
-                "summary": "Directory of public data breaches with summary, dates and types of exposed data.",
-                "source": "Have I Been Pwned",
-                "published": now,
-            },
-            {
-                "title": "Privacy Rights Clearinghouse Data Breach Chronology",
-                "link": "https://privacyrights.org/data-breaches",
-                "summary": "Historical log of reported data breaches with filters for industry and cause.",
-                "source": "Privacy Rights Clearinghouse",
-                "published": now,
-            },
-        ],
-        "APT": [
-            {
-                "title": "MITRE ATT&CK – Groups",
-                "link": "https://attack.mitre.org/groups/",
-                "summary": "Catalog of tracked threat groups (APTs) with techniques, software and campaigns.",
-                "source": "MITRE",
-                "published": now,
-            },
-            {
-                "title": "Mandiant – Threat Intelligence Blog",
-                "link": "https://www.mandiant.com/resources/blog",
-                "summary": "Research articles on nation-state and financially motivated intrusion campaigns.",
-                "source": "Mandiant",
-                "published": now,
-            },
-        ],
-        "Phishing": [
-            {
-                "title": "APWG Phishing Activity Trends Report",
-                "link": "https://apwg.org/trendsreports/",
-                "summary": "Regular reports with metrics on phishing volumes, lures, and targeted brands.",
-                "source": "APWG",
-                "published": now,
-            },
-            {
-                "title": "Google – How to Recognize & Avoid Phishing",
-                "link": "https://safety.google/security/phishing-prevention/",
-                "summary": "Practical guidance for spotting and reporting phishing attempts.",
-                "source": "Google Safety",
-                "published": now,
-            },
-        ],
-        "Cloud/SaaS": [
-            {
-                "title": "AWS Security Blog – Cloud Best Practices",
-                "link": "https://aws.amazon.com/blogs/security/",
-                "summary": "Updates and deep dives on securing workloads on AWS and hybrid environments.",
-                "source": "AWS",
-                "published": now,
-            },
-            {
-                "title": "Google Cloud Security Blog",
-                "link": "https://cloud.google.com/blog/topics/security",
-                "summary": "Product updates, incident write-ups and best practices for Google Cloud.",
-                "source": "Google Cloud",
-                "published": now,
-            },
-            {
-                "title": "Microsoft Security Blog – Cloud & Identity",
-                "link": "https://www.microsoft.com/security/blog/",
-                "summary": "Posts on SaaS security, identity protection and threat intelligence.",
-                "source": "Microsoft",
-                "published": now,
-            },
-        ],
-        "Malware/Tools": [
-            {
-                "title": "Malwarebytes Labs – Threat Intelligence",
-                "link": "https://www.malwarebytes.com/blog/threat-intelligence",
-                "summary": "Research articles on new malware families, loaders, and crimeware trends.",
-                "source": "Malwarebytes",
-                "published": now,
-            },
-            {
-                "title": "BleepingComputer – Malware News",
-                "link": "https://www.bleepingcomputer.com/malware/",
-                "summary": "News and analysis on active malware campaigns and defensive tools.",
-                "source": "BleepingComputer",
-                "published": now,
-            },
-            {
-                "title": "KrebsOnSecurity – Tools & Attacks",
-                "link": "https://krebsonsecurity.com/",
-                "summary": "In-depth investigations into cybercrime operations and malware ecosystems.",
-                "source": "KrebsOnSecurity",
-                "published": now,
-            },
-        ],
-    }
-    return base.get(cat, [])
+# Curated reference links per category, shown when every live source is
+# down. Built once; _fallback_items stamps Items with the current time.
+_FALLBACK_BASE: Dict[str, List[Dict]] = {
+    "Ransomware": [
+        {
+            "title": "CISA Ransomware Guidance & Resources",
+            "link": "https://www.cisa.gov/stopransomware",
+            "summary": "Official CISA hub with advisories, checklists, and prevention guidance for ransomware.",
+            "source": "CISA",
+        },
+        {
+            "title": "Nomoreransom.org Decryption Tools",
+            "link": "https://www.nomoreransom.org/en/decryption-tools.html",
+            "summary": "Repository of free decryption tools and advice for victims of common ransomware families.",
+            "source": "No More Ransom",
+        },
+    ],
+    "Vulnerabilities": [
+        {
+            "title": "NVD – National Vulnerability Database",
+            "link": "https://nvd.nist.gov/vuln/search",
+            "summary": "Search and browse CVEs with CVSS scoring, references, and impact information.",
+            "source": "NIST",
+        },
+        {
+            "title": "CISA Known Exploited Vulnerabilities Catalog",
+            "link": "https://www.cisa.gov/known-exploited-vulnerabilities-catalog",
+            "summary": "Authoritative list of CVEs that are known to be actively exploited in the wild.",
+            "source": "CISA",
+        },
+    ],
+    "Data Breaches": [
+        {
+            "title": "Have I Been Pwned – Latest Breaches",
+            "link": "https://haveibeenpwned.com/PwnedWebsites",
+            "summary": "Directory of public data breaches with summary, dates and types of exposed data.",
+            "source": "Have I Been Pwned",
+        },
+        {
+            "title": "Privacy Rights Clearinghouse Data Breach Chronology",
+            "link": "https://privacyrights.org/data-breaches",
+            "summary": "Historical log of reported data breaches with filters for industry and cause.",
+            "source": "Privacy Rights Clearinghouse",
+        },
+    ],
+    "APT": [
+        {
+            "title": "MITRE ATT&CK – Groups",
+            "link": "https://attack.mitre.org/groups/",
+            "summary": "Catalog of tracked threat groups (APTs) with techniques, software and campaigns.",
+            "source": "MITRE",
+        },
+        {
+            "title": "Mandiant – Threat Intelligence Blog",
+            "link": "https://www.mandiant.com/resources/blog",
+            "summary": "Research articles on nation-state and financially motivated intrusion campaigns.",
+            "source": "Mandiant",
+        },
+    ],
+    "Phishing": [
+        {
+            "title": "APWG Phishing Activity Trends Report",
+            "link": "https://apwg.org/trendsreports/",
+            "summary": "Regular reports with metrics on phishing volumes, lures, and targeted brands.",
+            "source": "APWG",
+        },
+        {
+            "title": "Google – How to Recognize & Avoid Phishing",
+            "link": "https://safety.google/security/phishing-prevention/",
+            "summary": "Practical guidance for spotting and reporting phishing attempts.",
+            "source": "Google Safety",
+        },
+    ],
+    "Cloud/SaaS": [
+        {
+            "title": "AWS Security Blog – Cloud Best Practices",
+            "link": "https://aws.amazon.com/blogs/security/",
+            "summary": "Updates and deep dives on securing workloads on AWS and hybrid environments.",
+            "source": "AWS",
+        },
+        {
+            "title": "Google Cloud Security Blog",
+            "link": "https://cloud.google.com/blog/topics/security",
+            "summary": "Product updates, incident write-ups and best practices for Google Cloud.",
+            "source": "Google Cloud",
+        },
+        {
+            "title": "Microsoft Security Blog – Cloud & Identity",
+            "link": "https://www.microsoft.com/security/blog/",
+            "summary": "Posts on SaaS security, identity protection and threat intelligence.",
+            "source": "Microsoft",
+        },
+    ],
+    "Malware/Tools": [
+        {
+            "title": "Malwarebytes Labs – Threat Intelligence",
+            "link": "https://www.malwarebytes.com/blog/threat-intelligence",
+            "summary": "Research articles on new malware families, loaders, and crimeware trends.",
+            "source": "Malwarebytes",
+        },
+        {
+            "title": "BleepingComputer – Malware News",
+            "link": "https://www.bleepingcomputer.com/malware/",
+            "summary": "News and analysis on active malware campaigns and defensive tools.",
+            "source": "BleepingComputer",
+        },
+        {
+            "title": "KrebsOnSecurity – Tools & Attacks",
+            "link": "https://krebsonsecurity.com/",
+            "summary": "In-depth investigations into cybercrime operations and malware ecosystems.",
+            "source": "KrebsOnSecurity",
+        },
+    ],
+}
+
+
+def _fallback_items(cat: str) -> List[Item]:
+    now, now_ts = _iso_now(), int(_now())
+    return [
+        Item(**it, published=now, published_ts=now_ts)
+        for it in _FALLBACK_BASE.get(cat, ())
+    ]
 
 
 # ------------------------- Category aggregation ------------------------
 
-def _fetch_category(cat: str) -> List[Dict]:
-    items: List[Dict] = []
+# Feed root element -> the element holding one story
+_FEED_ENTRY_TAGS = {"rss": "item", "RDF": "item", "feed": "entry"}
 
-    # RSS
-    for url in FEEDS.get(cat, []):
-        try:
-            feed = feedparser.parse(url)
-            for e in feed.get("entries", [])[:30]:
-                items.append(_normalize_entry(e))
-        except Exception:
+
+def _parse_feed(body: bytes, max_items: int = 30) -> List[Item]:
+    """
+    Pull title/link/summary/source/date straight out of an RSS or Atom
+    document with the C-accelerated ElementTree parser, which is far cheaper
+    than feedparser's full normalisation. Raises ET.ParseError on malformed
+    XML so the caller can fall back to feedparser.
+
+    The root element decides the dialect up front; anything that is not
+    RSS, RDF or Atom (an HTML error page, say) yields no items.
+    """
+    events = ET.iterparse(BytesIO(body), events=("start", "end"))
+    _, root = next(events)
+    entry_tag = _FEED_ENTRY_TAGS.get(root.tag.rpartition("}")[2])
+    if entry_tag is None:
+        return []
+
+    items: List[Item] = []
+    for event, el in events:
+        if event != "end" or el.tag.rpartition("}")[2] != entry_tag:
             continue
 
-    # OTX
+        fields: Dict[str, str] = {}
+        link = ""
+        for child in el:
+            name = child.tag.rpartition("}")[2]
+            if name == "link":
+                # RSS puts the URL in the text, Atom in href (prefer rel=alternate)
+                if not link:
+                    link = (child.text or "").strip()
+                if not link and child.get("rel", "alternate") == "alternate":
+                    link = child.get("href", "")
+            elif name == "author":
+                fields.setdefault(name, child.findtext("{*}name") or child.text or "")
+            else:
+                fields.setdefault(name, child.text or "")
+        el.clear()
+
+        # dc:date is the date element of RSS 1.0/RDF and common in RSS 2.0 too
+        date = (
+            fields.get("pubDate")
+            or fields.get("published")
+            or fields.get("updated")
+            or fields.get("date")
+        )
+        if date:
+            published_ts = _date_to_ts(date.strip())
+            published = _ISO_FMT % time.gmtime(published_ts)[:6]
+        else:
+            published, published_ts = _iso_now(), int(_now())
+        summary = fields.get("description") or fields.get("summary") or fields.get("content")
+        source = fields.get("source") or fields.get("author") or fields.get("creator")
+        items.append(
+            Item(
+                title=_plain_title(fields.get("title") or ""),
+                link=link,
+                summary=_plain_text(summary or ""),
+                source=sys.intern((source or "").strip()),
+                published=published,
+                published_ts=published_ts,
+            )
+        )
+        if len(items) >= max_items:
+            break
+    return items
+
+
+def _fetch_feed(url: str) -> List[Item]:
+    """
+    Download a feed ourselves on the shared session and parse the bytes.
+    feedparser's own HTTP client has no timeout and can hang forever on a
+    dead feed; _download bounds each socket read and the body as a whole.
+
+    Requests are conditional on the previous ETag/Last-Modified, so an
+    unchanged feed costs a 304 round-trip and reuses the last parse. Servers
+    that ignore validators still skip the parse when the body is identical.
+    """
+    etag, modified, digest, cached = _feed_meta.get(url, ("", "", b"", []))
+    headers: Dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+
+    resp, body = _download(url, headers=headers)
+    if resp.status_code == 304:
+        return cached
+    resp.raise_for_status()
+
+    new_digest = hashlib.blake2b(body, digest_size=16).digest()
+    if cached and new_digest == digest:
+        return cached
+
     try:
-        items.extend(_fetch_otx_for_category(cat))
-    except Exception:
+        items = _parse_feed(body)
+    except ET.ParseError:
+        items = []
+    if not items:
+        # feedparser copes with the malformed/exotic feeds we cannot read
+        feed = feedparser.parse(body)
+        items = [_normalize_entry(e) for e in feed.get("entries", [])[:30]]
+    if not items:
+        return cached
+    _feed_meta[url] = (
+        resp.headers.get("ETag", ""),
+        resp.headers.get("Last-Modified", ""),
+        new_digest,
+        items,
+    )
+    return items
+
+
+# Categories that also carry the Feodo Tracker C2 cards
+_FEODO_CATS = ("Ransomware", "Malware/Tools", "APT")
+
+# Sources per category, baked once at import: the feed URLs, the OTX query
+# (only when there is a key and a query to run) and the Feodo flag never
+# change, so a refresh just submits the prepared callables.
+_PLAN: Dict[str, Tuple[Callable[[], List[Item]], ...]] = {
+    cat: (
+        *(partial(_fetch_feed, url) for url in FEEDS.get(cat, [])),
+        *(
+            (partial(_fetch_otx_for_category, cat),)
+            if OTX_API_KEY and (API_QUERIES.get(cat) or {}).get("otx")
+            else ()
+        ),
+        *((_fetch_feodo_iocs,) if cat in _FEODO_CATS else ()),
+    )
+    for cat in CATEGORIES
+}
+
+# Source downloads are I/O-bound, so overlap them on a shared pool with one
+# worker per planned source: a full prewarm then runs every feed, OTX query
+# and Feodo call at once (the Feodo callers beyond the first just wait on
+# _feodo_lock). Categories get their own pool so a prewarm never starves the
+# source workers it waits on.
+_POOL_WORKERS = sum(map(len, _PLAN.values()))
+_POOL = ThreadPoolExecutor(max_workers=_POOL_WORKERS, thread_name_prefix="feed")
+_CATEGORY_POOL = ThreadPoolExecutor(
+    max_workers=len(CATEGORIES), thread_name_prefix="category"
+)
+# Every _POOL worker may hold a connection to the same host at once, so keep
+# that many per host; pool_connections is how many hosts stay cached.
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=32, pool_maxsize=_POOL_WORKERS, max_retries=1),
+)
+
+
+def _fetch_category(cat: str) -> List[Item]:
+    # De-duped as items arrive, keyed on (title, link): Feodo cards all share
+    # one link, so the link alone is not unique.
+    uniq: Dict[Tuple[str, str], Item] = {}
+
+    def add(new_items: List[Item]) -> None:
+        for it in new_items:
+            uniq.setdefault((it.title, it.link), it)
+
+    # RSS feeds, OTX and Feodo IOC cards are all fetched concurrently;
+    # a source that errors or stalls is skipped
+    futures = [_POOL.submit(fn) for fn in _PLAN.get(cat, ())]
+    try:
+        for fut in as_completed(futures, timeout=CATEGORY_FETCH_TIMEOUT_SECONDS):
+            try:
+                add(fut.result())
+            except Exception:
+                continue
+    except TimeoutError:
         pass
 
-    # Feodo IOC cards
-    if cat in ("Ransomware", "Malware/Tools", "APT"):
-        try:
-            items.extend(_fetch_feodo_iocs())
-        except Exception:
-            pass
+    # Top 60 by heap rather than a full sort of everything fetched
+    return nlargest(60, uniq.values(), key=_BY_TS)
 
-    # De-dupe & sort
+
+def _news_payload(items: List[Item]) -> Dict:
+    return {"items": items, "total_all": _total_all, "updated": _last_build_time_iso}
+
+
+def _encode_page(limit: int) -> Tuple[bytes, bytes, str]:
+    """/api/news body for `limit` as (json, gzip, etag). Hold _cache_lock."""
+    body = orjson.dumps(_news_payload(_home_cache[:limit]))
+    return body, gzip.compress(body, GZIP_LEVEL), _etag(body)
+
+
+def _rebuild_home() -> None:
+    """
+    Merge the newest items across every cached category and pre-encode the
+    default /api/news page, so requests only slice or return ready data.
+    Stories filed under several categories (e.g. Feodo cards) appear once.
+    Caller must hold _cache_lock.
+    """
+    global _home_cache, _total_all
+    buckets = [b for b in map(_news_cache.get, CATEGORIES) if b]
+    # Every bucket is already newest-first, so a k-way merge keeps the order
+    # without re-sorting and the first copy of a duplicate is the one kept.
     seen = set()
-    uniq: List[Dict] = []
-    for it in items:
-        key = (it.get("title"), it.get("link"))
+    merged: List[Item] = []
+    for it in merge(*(b["items"] for b in buckets), key=_BY_TS, reverse=True):
+        key = (it.title, it.link)
         if key in seen:
             continue
         seen.add(key)
-        uniq.append(it)
-
-    uniq.sort(key=lambda x: x["published"], reverse=True)
-    return uniq[:60]
+        if len(merged) < HOME_MAX_ITEMS:
+            merged.append(it)
+    _total_all = len(seen)
+    _home_cache = merged
+    _home_pages.clear()
+    _home_pages[NEWS_DEFAULT_LIMIT] = _encode_page(NEWS_DEFAULT_LIMIT)
 
 
 def _ensure_fresh(cat: str) -> Dict:
@@ -509,85 +1022,145 @@ def _ensure_fresh(cat: str) -> Dict:
     Returns a cached bucket for a category. If feeds return nothing,
     we fall back to curated links instead of empty tiles.
     Also triggers email notifications for brand-new items.
+
+    Locks only guard the dict reads/writes; the network fetch and the
+    notification emails happen outside them so readers never wait on I/O.
+    Only one thread refreshes a given category at a time: others get the
+    stale bucket if there is one, or wait for the refresh to land.
     """
-    global _last_build_time_iso, _seen_ids
-    with _cache_lock:
+    lock = _cat_locks[cat]
+    with lock:
         bucket = _news_cache.get(cat)
-        if not bucket or (_now() - bucket["ts"] > CACHE_TTL_SECONDS):
-            items = _fetch_category(cat)
-            if not items:
-                items = _fallback_items(cat)
-            if not items:
-                items = [{
-                    "title": f"{cat} – no live headlines right now",
-                    "link": "#",
-                    "summary": "Nothing live from the feeds at this moment.",
-                    "source": "System",
-                    "published": _iso_now(),
-                }]
-
-            # detect new items for notifications
-            new_items: List[Dict] = []
-            for it in items:
-                key = (it.get("title"), it.get("link"))
-                if key not in _seen_ids and it.get("link") not in ("", "#"):
-                    _seen_ids.add(key)
-                    new_items.append(it)
-
-            if new_items:
-                _notify_new_items(new_items)
-
-            bucket = {"ts": _now(), "items": items}
-            _news_cache[cat] = bucket
-            _last_build_time_iso = _iso_now()
-        return bucket
+        if bucket and (_now() - bucket["ts"] <= CACHE_TTL_SECONDS):
+            return bucket
+        evt = _inflight.get(cat)
+        leader = evt is None
+        if leader:
+            evt = _inflight[cat] = threading.Event()
+
+    if not leader:
+        if bucket:
+            return bucket
+        evt.wait(timeout=CATEGORY_FETCH_TIMEOUT_SECONDS)
+        with lock:
+            return _news_cache.get(cat) or {"ts": 0.0, "items": []}
+
+    try:
+        bucket, new_items = _refresh_category(cat)
+    finally:
+        with lock:
+            _inflight.pop(cat, None)
+        evt.set()
+
+    if new_items:
+        _notify_new_items(new_items)
+    return bucket
+
+
+def _refresh_category(cat: str) -> Tuple[Dict, List[Item]]:
+    """Fetch and store a fresh bucket; returns it with any never-seen items."""
+    global _last_build_time_iso
+    items = _fetch_category(cat)
+    if not items:
+        items = _fallback_items(cat)
+    if not items:
+        items = [Item(
+            title=f"{cat} – no live headlines right now",
+            link="#",
+            summary="Nothing live from the feeds at this moment.",
+            source="System",
+            published=_iso_now(),
+            published_ts=int(_now()),
+        )]
+
+    bucket = {"ts": _now(), "items": items}
+    with _cat_locks[cat]:
+        _news_cache[cat] = bucket
+
+    # detect new items for notifications; digests are computed before taking
+    # the lock so it only covers the LRU bookkeeping
+    keyed = [
+        (
+            hashlib.blake2b(
+                f"{it.title}\0{it.link}".encode("utf-8"), digest_size=8
+            ).digest(),
+            it,
+        )
+        for it in items
+        if it.link not in ("", "#")
+    ]
+    new_items: List[Item] = []
+    with _seen_lock:
+        for key, it in keyed:
+            if key in _seen_ids:
+                _seen_ids.move_to_end(key)
+            else:
+                _seen_ids[key] = None
+                new_items.append(it)
+        while len(_seen_ids) > _SEEN_MAX:
+            _seen_ids.popitem(last=False)
+
+    with _cache_lock:
+        _last_build_time_iso = _iso_now()
+        _rebuild_home()
+    return bucket, new_items
 
 
 def _prewarm():
-    for c in CATEGORIES:
-        try:
-            _ensure_fresh(c)
-        except Exception:
-            pass
+    futures = [_CATEGORY_POOL.submit(_ensure_fresh, c) for c in CATEGORIES]
+    wait(futures)
 
 
-def _background_refresher():
+async def _refresh_loop():
+    """
+    Periodic refresh on the server's event loop. The blocking fetches run in
+    a worker thread and the sleep is cancellable, so shutdown is clean and
+    importing the module (tests, --reload) no longer starts a refresher.
+    """
     while True:
         try:
-            _prewarm()
+            await asyncio.to_thread(_prewarm)
         except Exception:
             pass
-        time.sleep(BACKGROUND_REFRESH_SECONDS)
-
-
-threading.Thread(target=_background_refresher, daemon=True).start()
+        await asyncio.sleep(BACKGROUND_REFRESH_SECONDS)
 
 # ------------------------------- API -----------------------------------
 
-@app.get("/api/news", response_class=JSONResponse)
-def api_news(limit: int = Query(60, ge=1, le=200)):
+@app.get("/api/news")
+def api_news(request: Request, limit: int = Query(NEWS_DEFAULT_LIMIT, ge=1, le=HOME_MAX_ITEMS)):
     """
     Frontend just shows an 'All stories' tile wall, so we aggregate
-    all categories into one list.
+    all categories into one list. The merge is precomputed on refresh and
+    each page size is encoded once per refresh; here we only make sure
+    nothing is stale and return the stored bytes.
     """
-    merged: List[Dict] = []
     for c in CATEGORIES:
-        merged.extend(_ensure_fresh(c)["items"])
-    merged.sort(key=lambda x: x["published"], reverse=True)
-    merged = merged[:limit]
-    return {"items": merged, "total_all": len(merged), "updated": _last_build_time_iso}
+        _ensure_fresh(c)
+    with _cache_lock:
+        page = _home_pages.get(limit)
+        if page is None:
+            page = _home_pages[limit] = _encode_page(limit)
+    body, gz, etag = page
+    return _encoded_response(request, body, "application/json", gz, etag)
 
 
-@app.post("/api/refresh", response_class=JSONResponse)
+@app.post("/api/refresh")
 def api_refresh():
+    global _home_cache, _total_all, _feodo_cache
     with _cache_lock:
         _news_cache.clear()
+        _total_all = 0
+        _home_cache = []
+        _home_pages.clear()
+    with _feodo_lock:
+        _feodo_cache = ((-1, 0), [])
     _prewarm()
-    return {"status": "ok", "updated": _last_build_time_iso}
+    body = orjson.dumps({"status": "ok", "updated": _last_build_time_iso})
+    return Response(body, media_type="application/json")
 
 
 @app.get("/favicon.ico")
-def favicon():
+async def favicon():
     return Response(status_code=204)
 
 
@@ -852,11 +1425,23 @@ INDEX_HTML = r"""
     </main>
   </div>
 
+  <template id="cardTpl">
+    <article class="card">
+      <div class="card-kicker">Live </div>
+      <div class="card-title"></div>
+      <p class="card-summary"></p>
+      <div class="card-footer">
+        <span class="card-time"></span>
+      </div>
+    </article>
+  </template>
+
 <script>
 (function(){
   const grid = document.getElementById("grid");
   const storyCount = document.getElementById("storyCount");
   const lastUpdate = document.getElementById("lastUpdate");
+  const cardTpl = document.getElementById("cardTpl").content.firstElementChild;
 
   function jget(url){
     return fetch(url).then(r => r.json());
@@ -873,27 +1458,37 @@ INDEX_HTML = r"""
 
   function isRealItem(it){
     const title = (it.title || "").toLowerCase();
-    if (!it.link || it.link === "#") return false;
+    if (!/^https?:\/\//i.test(it.link || "")) return false;
     if (title.includes("placeholder")) return false;
     if (title.includes("no live headlines")) return false;
     return true;
   }
 
+  // Cards are cloned from a template and filled via textContent: no HTML
+  // string is built or re-parsed, and feed text can never become markup.
+  function buildCard(it, idx){
+    const card = cardTpl.cloneNode(true);
+    card.style.animationDelay = (idx * 0.02) + "s";
+    card.dataset.href = it.link;
+    card.querySelector(".card-title").textContent = it.title || "";
+    card.querySelector(".card-summary").textContent = it.summary || "";
+    card.querySelector(".card-time").textContent = fmtTime(it.published || "");
+    return card;
+  }
+
   function render(items){
     const real = items.filter(isRealItem);
     storyCount.textContent = real.length + " stories";
-    grid.innerHTML = real.map((it, idx) => `
-      <article class="card" style="animation-delay:${idx * 0.02}s" onclick="window.open('${it.link}','_blank')">
-        <div class="card-kicker">Live </div>
-        <div class="card-title">${it.title}</div>
-        <p class="card-summary">${it.summary || ""}</p>
-        <div class="card-footer">
-          <span>${fmtTime(it.published || "")}</span>
-        </div>
-      </article>
-    `).join("");
+    const frag = document.createDocumentFragment();
+    real.forEach((it, idx) => frag.appendChild(buildCard(it, idx)));
+    grid.replaceChildren(frag);
   }
 
+  grid.addEventListener("click", e => {
+    const card = e.target.closest(".card");
+    if (card) window.open(card.dataset.href, "_blank", "noopener");
+  });
+
   async function load(){
     const data = await jget("/api/news?limit=60");
     lastUpdate.textContent = "Updated " + fmtTime(data.updated);
@@ -1040,27 +1635,29 @@ AUTH_HTML = r"""
       <button class="btn" type="submit">Save</button>
     </form>
     <p class="muted">
-      Passwords are stored with a basic hash for demo purposes only. Do not reuse
-      sensitive production credentials here.
+      Passwords are stored as salted scrypt hashes. This is still a demo, so do
+      not reuse sensitive production credentials here.
     </p>
   </div>
 </body>
 </html>
 """
 
-# ------------------------------- Routes --------------------------------
+ANON_USER_HTML = """
+        <a class="auth-btn" href="/auth">
+          <span class="icon">⟶</span>
+          <span>Login / Register</span>
+        </a>
+        """
 
-@app.get("/", response_class=HTMLResponse)
-def index(request: Request):
-    user = _current_user(request)
-    if user:
-        initials = (user.get("username") or user.get("email") or "?")[:1].upper()
-        user_html = f"""
+# Header chip for a signed-in user. Only the chip uses str.format: the page
+# templates are full of CSS/JS braces, so they are pre-split instead.
+USER_CHIP_HTML = """
         <div class="user-chip">
           <div class="user-avatar">{initials}</div>
           <div class="user-meta">
-            <div class="user-name">{user.get('username') or 'User'}</div>
-            <div class="user-email">{user.get('email')}</div>
+            <div class="user-name">{username}</div>
+            <div class="user-email">{email}</div>
           </div>
           <div class="user-actions">
             <a href="/auth">Account</a>
@@ -1068,73 +1665,172 @@ def index(request: Request):
           </div>
         </div>
         """
-    else:
-        user_html = """
-        <a class="auth-btn" href="/auth">
-          <span class="icon">⟶</span>
-          <span>Login / Register</span>
-        </a>
-        """
 
-    html = INDEX_HTML.replace("%%USER_CONTROL%%", user_html)
-    return HTMLResponse(html)
+@lru_cache(maxsize=1024)
+def _user_chip(username: str, email: str) -> bytes:
+    """
+    Escaped, encoded header chip. Keyed on the values it shows, so a profile
+    change simply misses the cache and never needs clearing.
+    """
+    initials = (username or email or "?")[:1].upper()
+    return USER_CHIP_HTML.format_map(
+        {
+            "initials": html.escape(initials),
+            "username": html.escape(username or "User"),
+            "email": html.escape(email),
+        }
+    ).encode("utf-8")
+
+
+_PLACEHOLDER_RE = re.compile(r"%%(\w+)%%")
+
+
+def _compile_template(text: str) -> List:
+    """
+    Split on %%NAME%% once: UTF-8 encoded literals at even indexes, names
+    at odd ones. Only the substituted values are encoded per render.
+    """
+    parts = _PLACEHOLDER_RE.split(text)
+    parts[::2] = [p.encode("utf-8") for p in parts[::2]]
+    return parts
+
+
+def _render(parts: List, values: Dict[str, str]) -> bytes:
+    """Fill a compiled template in one join, without rescanning the text."""
+    out = parts[:]
+    out[1::2] = [values[name].encode("utf-8") for name in parts[1::2]]
+    return b"".join(out)
+
+
+_AUTH_TPL = _compile_template(AUTH_HTML)
+
+# The homepage only varies in the header chip: keep the encoded halves around
+# it so a logged-in render is a join, and the logged-out page fully built.
+_INDEX_PREFIX, _INDEX_SUFFIX = (
+    part.encode("utf-8") for part in INDEX_HTML.split("%%USER_CONTROL%%")
+)
+_INDEX_ANON_HTML = b"".join(
+    (_INDEX_PREFIX, ANON_USER_HTML.encode("utf-8"), _INDEX_SUFFIX)
+)
+_INDEX_ANON_GZ = gzip.compress(_INDEX_ANON_HTML, STATIC_GZIP_LEVEL)
+_INDEX_ANON_ETAG = _etag(_INDEX_ANON_HTML)
+
+# The logged-out /auth form has no user data in it either.
+_AUTH_ANON_HTML = _render(
+    _AUTH_TPL,
+    {
+        "AUTH_TITLE": "Login / Register",
+        "AUTH_SUB": "Create an account or update your details to receive CyberIntel updates.",
+        "USERNAME": "",
+        "EMAIL": "",
+    },
+)
+_AUTH_ANON_GZ = gzip.compress(_AUTH_ANON_HTML, STATIC_GZIP_LEVEL)
+_AUTH_ANON_ETAG = _etag(_AUTH_ANON_HTML)
+
+# ------------------------------- Routes --------------------------------
+
+# The page handlers do no I/O since the session cookie is self-contained, so
+# they run on the event loop rather than hopping to the threadpool.
+@app.get("/", response_class=HTMLResponse)
+async def index(request: Request):
+    user = _current_user(request)
+    if not user:
+        return _encoded_response(
+            request,
+            _INDEX_ANON_HTML,
+            "text/html; charset=utf-8",
+            _INDEX_ANON_GZ,
+            _INDEX_ANON_ETAG,
+        )
+
+    chip = _user_chip(user.get("username") or "", user.get("email") or "")
+    body = b"".join((_INDEX_PREFIX, chip, _INDEX_SUFFIX))
+    return _encoded_response(request, body, "text/html; charset=utf-8")
 
 
 @app.get("/auth", response_class=HTMLResponse)
-def auth_form(request: Request):
+async def auth_form(request: Request):
     user = _current_user(request)
-    if user:
-        title = "Account settings"
-        sub = "Update your profile or change your password."
-        username = user.get("username") or ""
-        email = user.get("email") or ""
-    else:
-        title = "Login / Register"
-        sub = "Create an account or update your details to receive CyberIntel updates."
-        username = ""
-        email = ""
-
-    html = (
-        AUTH_HTML.replace("%%AUTH_TITLE%%", title)
-        .replace("%%AUTH_SUB%%", sub)
-        .replace("%%USERNAME%%", username)
-        .replace("%%EMAIL%%", email)
+    if not user:
+        return _encoded_response(
+            request,
+            _AUTH_ANON_HTML,
+            "text/html; charset=utf-8",
+            _AUTH_ANON_GZ,
+            _AUTH_ANON_ETAG,
+        )
+
+    page = _render(
+        _AUTH_TPL,
+        {
+            "AUTH_TITLE": "Account settings",
+            "AUTH_SUB": "Update your display name; confirm it with your current password.",
+            "USERNAME": html.escape(user.get("username") or ""),
+            "EMAIL": html.escape(user.get("email") or ""),
+        },
     )
-    return HTMLResponse(html)
+    return _encoded_response(request, page, "text/html; charset=utf-8")
+
+
+_SESSION_COOKIE_ATTRS = "; Path=/; HttpOnly; SameSite=Lax" + (
+    "; Secure" if SESSION_COOKIE_SECURE else ""
+)
 
 
 @app.post("/auth")
-def auth_submit(
+async def auth_submit(
     request: Request,
+    background_tasks: BackgroundTasks,
     username: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
 ):
-    user, is_new = _register_or_update_user(username, email, password)
+    # scrypt and the users.json write block, so keep them off the event loop
+    user, is_new = await asyncio.to_thread(
+        _register_or_update_user, username, email, password
+    )
+    if user is None:
+        # the email belongs to an account with a different password
+        page = _render(
+            _AUTH_TPL,
+            {
+                "AUTH_TITLE": "Login / Register",
+                "AUTH_SUB": "That email is already registered with a different password.",
+                "USERNAME": html.escape(username.strip()),
+                "EMAIL": html.escape(email.strip()),
+            },
+        )
+        return Response(page, status_code=401, media_type="text/html; charset=utf-8")
     if is_new:
-        _send_welcome_email(user)
-
-    resp = RedirectResponse("/", status_code=302)
-    # "logged in" – set cookie with email
-    resp.set_cookie(
-        SESSION_COOKIE_NAME,
-        user["email"],
-        max_age=60 * 60 * 24 * 30,  # 30 days
-        httponly=False,
+        # SMTP happens after the redirect has been sent
+        background_tasks.add_task(_send_welcome_email, user)
+
+    # "logged in" – signed session cookie, see _session_token. The token is
+    # base64url and a dot, so it needs no quoting and the header is built as is.
+    cookie = (
+        f"{SESSION_COOKIE_NAME}={_session_token(user)}; Max-Age={SESSION_MAX_AGE}"
+        + _SESSION_COOKIE_ATTRS
     )
-    return resp
+    return Response(status_code=302, headers={"location": "/", "set-cookie": cookie})
+
+
+# Logging out is always the same redirect and cookie expiry
+_LOGOUT_HEADERS = {
+    "location": "/",
+    "set-cookie": f"{SESSION_COOKIE_NAME}=; Max-Age=0" + _SESSION_COOKIE_ATTRS,
+}
 
 
 @app.get("/logout")
-def logout():
-    resp = RedirectResponse("/", status_code=302)
-    resp.delete_cookie(SESSION_COOKIE_NAME)
-    return resp
+async def logout():
+    return Response(status_code=302, headers=_LOGOUT_HEADERS)
 
 
 # ------------------------------- Main ----------------------------------
 
 if __name__ == "__main__":
     import uvicorn
-    _prewarm()
+    # No blocking _prewarm() here: the lifespan refresher warms the cache in
+    # the background as soon as the server starts accepting requests.
     uvicorn.run(app, host="127.0.0.1", port=8000)